@@ -0,0 +1,94 @@
+"""
+Pure risk-assessment helpers used by SymptomInput.
+
+Only primitive arguments and return values, so this module can be
+compiled with mypyc (`mypyc app/_kernels.py`) for a faster hot path.
+It works unchanged as plain Python when it isn't compiled.
+"""
+from enum import IntEnum
+from typing import Optional
+import sys
+
+
+class Urgency(IntEnum):
+    LOW = 0
+    MODERATE = 1
+    HIGH = 2
+    CRITICAL = 3
+
+
+class PatientCategory(IntEnum):
+    UNKNOWN = 0
+    INFANT = 1
+    PEDIATRIC = 2
+    ADOLESCENT = 3
+    ADULT = 4
+    GERIATRIC = 5
+
+
+# Wire-format names, indexed by enum value
+URGENCY_NAMES = tuple(sys.intern(u.name) for u in Urgency)
+PATIENT_CATEGORY_NAMES = tuple(sys.intern(c.name) for c in PatientCategory)
+
+
+def risk_score(age: Optional[int], severity: Optional[int],
+               heart_rate: Optional[int], temperature: Optional[float]) -> int:
+    """
+    Calculate risk score based on age, severity, and vital signs
+    Range: 0-100
+    """
+    score = 0
+
+    # Age component (0-30 points)
+    if age:
+        if age < 1:
+            score += 20
+        elif age < 5:
+            score += 15
+        elif age > 70:
+            score += 25
+        elif age > 60:
+            score += 15
+        else:
+            score += 5
+
+    # Severity component (0-40 points)
+    if severity:
+        score += severity * 4
+
+    # Vital signs component (0-30 points)
+    if heart_rate:
+        if heart_rate > 100 or heart_rate < 60:
+            score += 15
+
+    if temperature:
+        if temperature > 100.4 or temperature < 97:
+            score += 15
+
+    return min(score, 100)  # Cap at 100
+
+
+def urgency_level(score: int) -> Urgency:
+    """Determine urgency based on risk score"""
+    if score >= 70:
+        return Urgency.CRITICAL
+    if score >= 50:
+        return Urgency.HIGH
+    if score >= 30:
+        return Urgency.MODERATE
+    return Urgency.LOW
+
+
+def patient_category(age: Optional[int]) -> PatientCategory:
+    """Categorize patient by age"""
+    if not age:
+        return PatientCategory.UNKNOWN
+    if age < 2:
+        return PatientCategory.INFANT
+    if age < 12:
+        return PatientCategory.PEDIATRIC
+    if age < 18:
+        return PatientCategory.ADOLESCENT
+    if age < 65:
+        return PatientCategory.ADULT
+    return PatientCategory.GERIATRIC
@@ -1,5 +1,7 @@
-from fastapi import FastAPI, status, HTTPException
+from fastapi import FastAPI, status, HTTPException, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse
 from fastapi.exceptions import RequestValidationError
 from starlette.exceptions import HTTPException as StarletteHTTPException
 from app.schemas import SymptomInput, EchoResponse, DiagnosisResponse, DiagnosisHistory
@@ -9,19 +11,88 @@ from app.middleware import (
     http_exception_handler,
     general_exception_handler
 )
-from datetime import datetime
-from typing import List
+from pydantic import TypeAdapter
+from collections import deque
+from enum import IntEnum
+from functools import lru_cache
+from typing import Deque, List
+import time
+import orjson
 
 
 # In-memory storage (temporary - we'll use PostgreSQL in Week 3)
-diagnosis_history: List[DiagnosisHistory] = []
+# Bounded so the oldest entries are dropped instead of growing forever
+HISTORY_MAX_ENTRIES = 10_000
+diagnosis_history: Deque[DiagnosisHistory] = deque(maxlen=HISTORY_MAX_ENTRIES)
 diagnosis_counter = 0
+# Bumped on every change so /history can reuse its last serialized body
+history_version = 0
+
+_history_adapter = TypeAdapter(List[DiagnosisHistory])
+
+# Constant payloads for / and /health, serialized once at import
+_ROOT_BYTES = orjson.dumps({
+    "message": "Asclepius API is running!",
+    "status": "running",
+    "version": "0.1.0"
+})
+_HEALTH_BYTES = orjson.dumps({
+    "status": "healthy",
+    "service": "asclepius-api"
+})
+
+class DiagnosisSeverity(IntEnum):
+    MILD = 0
+    MODERATE = 1
+    SEVERE = 2
+    EMERGENCY = 3
+
+
+# (severity, recommendation, confidence) for each diagnosis outcome
+_DIAGNOSIS_TEMPLATES = {
+    DiagnosisSeverity.EMERGENCY: ("emergency", "🚨 Call 112 immediately or go to the nearest emergency room", 0.95),
+    DiagnosisSeverity.SEVERE: ("severe", "Seek medical attention within 4 hours", 0.80),
+    DiagnosisSeverity.MODERATE: ("moderate", "Consider seeing a doctor within 24-48 hours", 0.70),
+    DiagnosisSeverity.MILD: ("mild", "Monitor symptoms. Rest and stay hydrated. See a doctor if symptoms worsen.", 0.65),
+}
+
+
+def _severity_bucket(severity) -> int:
+    """Map severity to a bucket: None -> 0, 1-4 -> 1, 5-7 -> 2, 8-10 -> 3"""
+    if not severity:
+        return 0
+    if severity >= 8:
+        return 3
+    if severity >= 5:
+        return 2
+    return 1
+
+
+def _classify(is_emergency: bool, severity_bucket: int) -> tuple:
+    """Pick the diagnosis template from the emergency keyword match and a severity bucket"""
+    # Check for emergency keywords first, then severity from user input
+    if is_emergency:
+        key = DiagnosisSeverity.EMERGENCY
+    elif severity_bucket == 3:
+        key = DiagnosisSeverity.SEVERE
+    elif severity_bucket == 2:
+        key = DiagnosisSeverity.MODERATE
+    else:
+        key = DiagnosisSeverity.MILD
+    return _DIAGNOSIS_TEMPLATES[key]
+
+
+@lru_cache(maxsize=1)
+def _serialize_history(version: int) -> bytes:
+    """Serialize the history once per version"""
+    return _history_adapter.dump_json(list(diagnosis_history))
 
 # Create the FastAPI app instance
 app = FastAPI(
     title='Asclepius API',
     description='Learning FastAPI with a medical symptom checker',
-    version='0.1.0'
+    version='0.1.0',
+    default_response_class=ORJSONResponse
 )
 
 #CORS middleware
@@ -33,6 +104,9 @@ app.add_middleware(
     allow_headers = ["*"],
 )
 
+# GZip middleware - only responses >= 1 KB (e.g. a populated /history) get compressed
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
+
 # Logging middleware
 app.middleware("http")(log_requests)
 
@@ -44,19 +118,12 @@ app.add_exception_handler(Exception, general_exception_handler)
 # Root endpoint
 @app.get("/")
 async def root():
-    return {
-        "message": "Asclepius API is running!",
-        "status": "running",
-        "version": "0.1.0"
-    }
+    return Response(content=_ROOT_BYTES, media_type="application/json")
 
 # Health-check endpoint
 @app.get("/health")
 async def health_check():
-    return {
-        "status": "healthy",
-        "service": "asclepius-api"
-    }
+    return Response(content=_HEALTH_BYTES, media_type="application/json")
 
 # Echo endpoint - accepts POST requests
 @app.post("/echo", response_model=EchoResponse)
@@ -82,66 +149,38 @@ async def diagnose_symptoms(symptom_data: SymptomInput):
     Analyse symptoms and provide a basic diagnosis.
     Later I'll connect it to real AI model.
     """
-    global diagnosis_counter
+    global diagnosis_counter, history_version
     
     # Simple keyword-based logic (I'll replace this with AI later)
-    symptoms_lower = symptom_data.symptoms.lower()
-    
-    # Check for emergency keywords
-    emergency_keywords = ["chest pain", "can't breathe", "severe bleeding", "stroke"]
-    if any(keyword in symptoms_lower for keyword in emergency_keywords):
-        result = DiagnosisResponse(
-            severity="emergency",
-            recommendation="🚨 Call 112 immediately or go to the nearest emergency room",
-            confidence=0.95,
-            analyzed_symptoms=symptom_data.symptoms,
-            risk_score=symptom_data.risk_score,
-            urgency_level=symptom_data.urgency_level,
-            patient_category=symptom_data.patient_category
-        )
-    # Check severity from user input
-    elif symptom_data.severity and symptom_data.severity >= 8:
-        result = DiagnosisResponse(
-            severity="severe",
-            recommendation="Seek medical attention within 4 hours",
-            confidence=0.80,
-            analyzed_symptoms=symptom_data.symptoms,
-            risk_score=symptom_data.risk_score,
-            urgency_level=symptom_data.urgency_level,
-            patient_category=symptom_data.patient_category
-        )
-    elif symptom_data.severity and symptom_data.severity >= 5:
-        result = DiagnosisResponse(
-            severity="moderate",
-            recommendation="Consider seeing a doctor within 24-48 hours",
-            confidence=0.70,
-            analyzed_symptoms=symptom_data.symptoms,
-            risk_score=symptom_data.risk_score,
-            urgency_level=symptom_data.urgency_level,
-            patient_category=symptom_data.patient_category
-        )
-    else:
-        result = DiagnosisResponse(
-            severity="mild",
-            recommendation="Monitor symptoms. Rest and stay hydrated. See a doctor if symptoms worsen.",
-            confidence=0.65,
-            analyzed_symptoms=symptom_data.symptoms,
-            risk_score=symptom_data.risk_score,
-            urgency_level=symptom_data.urgency_level,
-            patient_category=symptom_data.patient_category
-        )
+    # keyword_hits is cached on the model, so the validators' scan is reused
+    severity, recommendation, confidence = _classify(
+        "emergency" in symptom_data.keyword_hits,
+        _severity_bucket(symptom_data.severity)
+    )
+    # Template values are known-good constants, so skip re-validation
+    result = DiagnosisResponse.model_construct(
+        severity=severity,
+        recommendation=recommendation,
+        confidence=confidence,
+        analyzed_symptoms=symptom_data.symptoms,
+        risk_score=symptom_data.risk_score,
+        urgency_level=symptom_data.urgency_level,
+        patient_category=symptom_data.patient_category
+    )
     
     # Save to history
     diagnosis_counter += 1
-    history_entry = DiagnosisHistory(
+    # All values are already validated, so skip re-validation
+    history_entry = DiagnosisHistory.model_construct(
         id=diagnosis_counter,
         symptoms=symptom_data.symptoms,
         severity=result.severity,
         recommendation=result.recommendation,
         risk_score=result.risk_score,
-        timestamp=datetime.now()
+        timestamp_ns=time.time_ns()
     )
     diagnosis_history.append(history_entry)
+    history_version += 1
     
     return result
 
@@ -152,7 +191,7 @@ async def get_diagnosis_history():
     Get all past diagnosis records.
     In Week 3, this will query from PostgreSQL database.
     """
-    return diagnosis_history
+    return Response(content=_serialize_history(history_version), media_type="application/json")
 
 # Clear history endpoint (useful for testing)
 @app.delete("/history", status_code=status.HTTP_204_NO_CONTENT)
@@ -160,7 +199,8 @@ async def clear_history():
     """
     Clear all diagnosis history (for testing purposes).
     """
-    global diagnosis_counter
+    global diagnosis_counter, history_version
     diagnosis_history.clear()
     diagnosis_counter = 0
+    history_version += 1
     
@@ -1,21 +1,41 @@
-from fastapi import Request, status
-from fastapi.responses import JSONResponse
+from fastapi import Request, Response, status
 from fastapi.exceptions import RequestValidationError
 from starlette.exceptions import HTTPException as StarletteHTTPException
+from logging.handlers import QueueHandler, QueueListener
+import atexit
+import queue
 import time
 import logging
-import traceback
+import orjson
+
+class _DeferredQueueHandler(QueueHandler):
+    """Queue records unformatted so messages and tracebacks are built on the listener thread"""
+    def prepare(self, record):
+        # No copy or formatting here: args and exc_info are only turned into text later,
+        # on the listener thread, so mutable objects passed as log args may have changed by then
+        return record
+
 
 #configure logging
+# Records are queued on the request path; a background thread formats and writes them
+_log_handler = logging.StreamHandler()
+_log_handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+_log_queue: queue.Queue[logging.LogRecord] = queue.Queue(-1)
+_log_listener = QueueListener(_log_queue, _log_handler, respect_handler_level=True)
+_log_listener.start()
+atexit.register(_log_listener.stop)  # flush queued records on shutdown
+
 logging.basicConfig(
     level = logging.INFO,
-    format = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    handlers = [_DeferredQueueHandler(_log_queue)]
 )
 logger = logging.getLogger(__name__)
 
 async def log_requests(request: Request, call_next):
-    start_time = time.time()
-    logger.info(f"{request.method} - {request.url.path}")
+    start_ns = time.perf_counter_ns()
+    log_info = logger.isEnabledFor(logging.INFO)
+    if log_info:
+        logger.info(f"{request.method} - {request.url.path}")
 
     try:
         response = await call_next(request)
@@ -23,30 +43,41 @@ async def log_requests(request: Request, call_next):
         logger.error("Request failed during processing")
         raise
 
-    process_time = time.time() - start_time
-    logger.info(f"Completed in {process_time:.5f}s - Status: {response.status_code}")
+    elapsed_ms = f"{(time.perf_counter_ns() - start_ns) / 1_000_000:.3f}ms"
+    if log_info:
+        logger.info(f"Completed in {elapsed_ms} - Status: {response.status_code}")
 
-    response.headers["X-Process-Time"] = str(process_time)
+    response.headers["X-Process-Time"] = elapsed_ms
     return response
 
+def _error_response(status_code: int, content: dict) -> Response:
+    """Build a JSON error response, serialized with orjson"""
+    return Response(
+        content=orjson.dumps(content),
+        status_code=status_code,
+        media_type="application/json"
+    )
+
+
 async def validation_exception_handler(request: Request, exc: RequestValidationError):
     logger.error(f"Validation error on {request.method} {request.url.path}")
     
-    cleaned_errors = []
-    for error in exc.errors():
-        cleaned_errors.append({
+    cleaned_errors = [
+        {
             "field": error.get("loc"),
             "message": error.get("msg"),
             "type": error.get("type")
-        })
+        }
+        for error in exc.errors()
+    ]
 
-    return JSONResponse(
-        status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
-        content={
+    return _error_response(
+        status.HTTP_422_UNPROCESSABLE_ENTITY,
+        {
             "error": "Validation Error",
             "message": "Invalid input data provided",
             "details": cleaned_errors,
-            "path": str(request.url.path)
+            "path": request.url.path
         }
     )
 
@@ -57,13 +88,13 @@ async def http_exception_handler(request: Request, exc: StarletteHTTPException):
     """
     logger.error(f"HTTP {exc.status_code} error on {request.method} {request.url.path}: {exc.detail}")
     
-    return JSONResponse(
-        status_code=exc.status_code,
-        content={
+    return _error_response(
+        exc.status_code,
+        {
             "error": "HTTP Error",
             "message": str(exc.detail),
             "status_code": exc.status_code,
-            "path": str(request.url.path)
+            "path": request.url.path
         }
     )
 
@@ -72,15 +103,14 @@ async def general_exception_handler(request: Request, exc: Exception):
     """
     Handle unexpected errors
     """
-    logger.error(f"Unexpected error on {request.method} {request.url.path}: {str(exc)}")
-    logger.error(traceback.format_exc())
+    logger.error("Unexpected error on %s %s: %s", request.method, request.url.path, exc, exc_info=exc)
     
-    return JSONResponse(
-        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-        content={
+    return _error_response(
+        status.HTTP_500_INTERNAL_SERVER_ERROR,
+        {
             "error": "Internal Server Error",
             "message": "An unexpected error occurred. Please try again later.",
-            "path": str(request.url.path),
+            "path": request.url.path,
             "type": type(exc).__name__
         }
     )
\ No newline at end of file
@@ -1,9 +1,57 @@
-from pydantic import BaseModel, Field, field_validator, model_validator, computed_field, ConfigDict
+from pydantic import BaseModel, Field, PrivateAttr, field_validator, model_validator, computed_field, ConfigDict
 from typing import Optional, Literal, List
 from datetime import datetime
 import re
+import ahocorasick
+from app import _kernels
 
 
+# Keyword phrases, matched as lower-case substrings
+_EMERGENCY_PHRASES = frozenset({"chest pain", "can't breathe", "severe bleeding", "stroke"})
+_SPAM_PHRASES = frozenset({'test', 'testing', 'asdf', 'qwerty', 'none', 'n/a', 'dummy'})
+_ADULT_PHRASES = frozenset({'pregnancy', 'menopause', 'prostate', 'erectile', 'viagra'})
+_ELDERLY_SERIOUS_PHRASES = frozenset({'chest pain', 'stroke', 'fall'})
+_SERIOUS_PHRASES = frozenset({'severe', 'extreme', 'intense', 'unbearable', 'can\'t', 'unable'})
+_ALARMING_PHRASES = frozenset({'severe', 'extreme', 'unbearable', 'emergency'})
+
+# Keyword categories shared by the validators and the /diagnose endpoint
+KEYWORD_CATEGORIES = {
+    "emergency": _EMERGENCY_PHRASES,
+    "spam": _SPAM_PHRASES,
+    "adult": _ADULT_PHRASES,
+    "elderly_serious": _ELDERLY_SERIOUS_PHRASES,
+    "serious": _SERIOUS_PHRASES,
+    "alarming": _ALARMING_PHRASES,
+}
+
+
+def _build_keyword_automaton():
+    """Compile every category into one Aho-Corasick automaton (phrase -> categories)"""
+    phrase_categories = {}
+    for category, phrases in KEYWORD_CATEGORIES.items():
+        for phrase in phrases:
+            phrase_categories.setdefault(phrase, set()).add(category)
+
+    automaton = ahocorasick.Automaton()
+    for phrase, categories in phrase_categories.items():
+        automaton.add_word(phrase, frozenset(categories))
+    automaton.make_automaton()
+    return automaton
+
+
+KEYWORD_AUTOMATON = _build_keyword_automaton()
+
+# Blood pressure in systolic/diastolic format (e.g., 120/80)
+_BP_RE = re.compile(r'^(\d{2,3})/(\d{2,3})$')
+
+
+def match_keyword_categories(text_lower: str) -> set:
+    """Return every keyword category found in the text, in a single pass"""
+    hits = set()
+    for _, categories in KEYWORD_AUTOMATON.iter(text_lower):
+        hits |= categories
+    return hits
+
 
 class VitalSigns(BaseModel):
     """Custom type for vital signs with validation"""
@@ -17,10 +65,12 @@ class VitalSigns(BaseModel):
         if v is None:
             return v
         # Check format: systolic/diastolic (e.g., 120/80)
-        if not re.match(r'^\d{2,3}/\d{2,3}$', v):
+        match = _BP_RE.match(v)
+        if not match:
             raise ValueError('Blood pressure must be in format: systolic/diastolic (e.g., 120/80)')
         
-        systolic, diastolic = map(int, v.split('/'))
+        systolic = int(match.group(1))
+        diastolic = int(match.group(2))
         
         if not (70 <= systolic <= 200):
             raise ValueError('Systolic pressure must be between 70-200 mmHg')
@@ -48,7 +98,15 @@ class SymptomInput(BaseModel):
     blood_pressure: Optional[str] = Field(None, description="Format: 120/80")
     temperature: Optional[float] = Field(None, ge=95.0, le=108.0, description="Body temperature in Fahrenheit")
     
-  
+    # Derived values, set once by compute_risk_assessment
+    _risk_score: int = PrivateAttr(default=0)
+    _urgency_level: str = PrivateAttr(default="LOW")
+    _patient_category: str = PrivateAttr(default="UNKNOWN")
+    
+    # Lower-cased symptoms and their keyword categories, set once by cache_symptoms_lower
+    _symptoms_lower: str = PrivateAttr(default="")
+    _keyword_hits: set = PrivateAttr(default_factory=set)
+    
     
     @field_validator('symptoms')
     @classmethod
@@ -57,15 +115,21 @@ class SymptomInput(BaseModel):
         v_lower = v.strip().lower()
         
         # Check for common test phrases
-        spam_phrases = ['test', 'testing', 'asdf', 'qwerty', 'none', 'n/a', 'dummy']
-        if any(phrase in v_lower for phrase in spam_phrases):
+        if "spam" in match_keyword_categories(v_lower):
             raise ValueError('Please provide real symptom description, not test data')
         
         # Check for repeated words (e.g., "pain pain pain pain")
         words = v_lower.split()
-        if len(words) > 3:
-            unique_words = set(words)
-            if len(unique_words) / len(words) < 0.4:  # Less than 40% unique words
+        word_count = len(words)
+        if word_count > 3:
+            # Need at least 40% unique words; stop as soon as that is reached
+            needed = (word_count * 4 + 9) // 10  # ceil(word_count * 0.4)
+            unique_words = set()
+            for word in words:
+                unique_words.add(word)
+                if len(unique_words) >= needed:
+                    break
+            else:
                 raise ValueError('Please provide varied symptom description')
         
         # Check for excessive punctuation
@@ -81,10 +145,12 @@ class SymptomInput(BaseModel):
         if v is None:
             return v
         
-        if not re.match(r'^\d{2,3}/\d{2,3}$', v):
+        match = _BP_RE.match(v)
+        if not match:
             raise ValueError('Blood pressure must be in format: 120/80')
         
-        systolic, diastolic = map(int, v.split('/'))
+        systolic = int(match.group(1))
+        diastolic = int(match.group(2))
         
         if not (70 <= systolic <= 200):
             raise ValueError('Systolic pressure must be between 70-200 mmHg')
@@ -107,22 +173,31 @@ class SymptomInput(BaseModel):
         return v
     
     
+    @model_validator(mode='after')
+    def cache_symptoms_lower(self):
+        """Lower-case and scan the symptoms once for the validators below"""
+        self._symptoms_lower = self.symptoms.lower()
+        self._keyword_hits = match_keyword_categories(self._symptoms_lower)
+        return self
+    
+    @property
+    def keyword_hits(self) -> set:
+        """Keyword categories found in the symptoms"""
+        return self._keyword_hits
+    
     @model_validator(mode='after')
     def validate_age_symptom_compatibility(self):
         """Check if age and symptoms make sense together"""
         if self.age and self.symptoms:
-            symptoms_lower = self.symptoms.lower()
-            
             # Pediatric checks (age < 12)
             if self.age < 12:
-                adult_keywords = ['pregnancy', 'menopause', 'prostate', 'erectile', 'viagra']
-                if any(keyword in symptoms_lower for keyword in adult_keywords):
+                if "adult" in self.keyword_hits:
                     raise ValueError(f'Symptoms not appropriate for age {self.age}')
             
             # Geriatric checks (age > 70)
             if self.age > 70 and self.severity and self.severity < 3:
                 # Elderly patients rarely self-report low severity for serious conditions
-                if any(word in symptoms_lower for word in ['chest pain', 'stroke', 'fall']):
+                if "elderly_serious" in self.keyword_hits:
                     raise ValueError('Severity seems low for reported symptoms in elderly patient')
         
         return self
@@ -131,93 +206,48 @@ class SymptomInput(BaseModel):
     def validate_severity_matches_description(self):
         """Ensure severity matches symptom description"""
         if self.severity and self.symptoms:
-            symptoms_lower = self.symptoms.lower()
-            
             # High severity should have serious keywords
             if self.severity >= 8:
-                serious_keywords = ['severe', 'extreme', 'intense', 'unbearable', 'can\'t', 'unable']
-                if not any(keyword in symptoms_lower for keyword in serious_keywords):
+                if "serious" not in self.keyword_hits:
                     raise ValueError('High severity (8+) should be described with words like "severe", "intense", etc.')
             
             # Low severity shouldn't have emergency keywords
             if self.severity <= 3:
-                emergency_keywords = ['severe', 'extreme', 'unbearable', 'emergency']
-                if any(keyword in symptoms_lower for keyword in emergency_keywords):
+                if "alarming" in self.keyword_hits:
                     raise ValueError('Low severity (1-3) conflicts with emergency-level symptom description')
         
         return self
     
     
+    @model_validator(mode='after')
+    def compute_risk_assessment(self):
+        """Calculate risk score, urgency level and patient category in one pass"""
+        score = _kernels.risk_score(self.age, self.severity, self.heart_rate, self.temperature)
+        self._risk_score = score
+        self._urgency_level = _kernels.URGENCY_NAMES[_kernels.urgency_level(score)]
+        self._patient_category = _kernels.PATIENT_CATEGORY_NAMES[_kernels.patient_category(self.age)]
+        return self
+    
     @computed_field
     @property
     def risk_score(self) -> int:
-        """
-        Calculate risk score based on age, severity, and vital signs
-        Range: 0-100
-        """
-        score = 0
-        
-        # Age component (0-30 points)
-        if self.age:
-            if self.age < 1:
-                score += 20
-            elif self.age < 5:
-                score += 15
-            elif self.age > 70:
-                score += 25
-            elif self.age > 60:
-                score += 15
-            else:
-                score += 5
-        
-        # Severity component (0-40 points)
-        if self.severity:
-            score += self.severity * 4
-        
-        # Vital signs component (0-30 points)
-        if self.heart_rate:
-            if self.heart_rate > 100 or self.heart_rate < 60:
-                score += 15
-        
-        if self.temperature:
-            if self.temperature > 100.4 or self.temperature < 97:
-                score += 15
-        
-        return min(score, 100)  # Cap at 100
+        """Calculated risk score 0-100"""
+        return self._risk_score
     
     @computed_field
     @property
     def urgency_level(self) -> str:
-        """
-        Determine urgency based on risk score
-        """
-        if self.risk_score >= 70:
-            return "CRITICAL"
-        elif self.risk_score >= 50:
-            return "HIGH"
-        elif self.risk_score >= 30:
-            return "MODERATE"
-        else:
-            return "LOW"
+        """Urgency level based on risk"""
+        return self._urgency_level
     
     @computed_field
     @property
     def patient_category(self) -> str:
-        """Categorize patient by age"""
-        if not self.age:
-            return "UNKNOWN"
-        if self.age < 2:
-            return "INFANT"
-        elif self.age < 12:
-            return "PEDIATRIC"
-        elif self.age < 18:
-            return "ADOLESCENT"
-        elif self.age < 65:
-            return "ADULT"
-        else:
-            return "GERIATRIC"
+        """Patient age category"""
+        return self._patient_category
     
     model_config = ConfigDict(
+        frozen=True,
         json_schema_extra={
             "example": {
                 "symptoms": "I have a persistent severe headache with dizziness and nausea",
@@ -242,6 +272,8 @@ class EchoResponse(BaseModel):
     risk_score: int
     urgency_level: str
     patient_category: str
+    
+    model_config = ConfigDict(extra='forbid', frozen=True)
 
 
 class DiagnosisResponse(BaseModel):
@@ -255,6 +287,8 @@ class DiagnosisResponse(BaseModel):
     patient_category: str = Field(..., description="Patient age category")
     
     model_config = ConfigDict(
+        extra='forbid',
+        frozen=True,
         json_schema_extra={
             "example": {
                 "severity": "moderate",
@@ -276,9 +310,19 @@ class DiagnosisHistory(BaseModel):
     severity: str
     recommendation: str
     risk_score: int
-    timestamp: datetime
+    # Stored as epoch nanoseconds; converted to a datetime only when serialized
+    timestamp_ns: int = Field(..., exclude=True)
+    
+    @computed_field
+    @property
+    def timestamp(self) -> datetime:
+        """Local time the diagnosis was made"""
+        seconds, nanos = divmod(self.timestamp_ns, 1_000_000_000)
+        return datetime.fromtimestamp(seconds).replace(microsecond=nanos // 1000)
     
     model_config = ConfigDict(
+        extra='forbid',
+        frozen=True,
         json_schema_extra={
             "example": {
                 "id": 1,